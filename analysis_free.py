@@ -3,157 +3,301 @@ Free tier analysis: Basic sentiment, complaints, praise, JTBDs, forces, and outc
 """
 
 import streamlit as st
-import pandas as pd
+import numpy as np
 import re
-from collections import Counter
-from textblob import TextBlob
+from concurrent.futures import ThreadPoolExecutor
 
 from utils import (
-    STOP_WORDS, FEATURE_PATTERNS, FORCE_PATTERNS, OUTCOME_DIMENSIONS,
-    extract_sentences, find_keyword_in_text, extract_snippet, 
-    extract_complete_sentence, extract_jtbd_components
+    FEATURE_PATTERNS, FEATURE_REGEXES, SENTENCE_SPLIT_REGEX, split_sentences,
+    find_keyword_in_text, extract_complete_sentence, build_theme_automaton,
+    keyword_list_automaton, first_unique
 )
 
 
-def get_sentiment(text):
-    """Calculate sentiment polarity using TextBlob"""
-    if not text or pd.isna(text):
-        return 'neutral'
-    blob = TextBlob(str(text))
-    polarity = blob.sentiment.polarity
-    if polarity > 0.1:
-        return 'positive'
-    elif polarity < -0.1:
-        return 'negative'
-    return 'neutral'
+# Common complaint patterns by category
+COMPLAINT_PATTERNS = {
+    '💰 Pricing/Monetization': [
+        ('subscription model', ['subscription', 'recurring', 'monthly', 'yearly', 'one-time', 'one time']),
+        ('price too high', ['expensive', 'too much', 'overpriced', 'cost', 'price']),
+        ('hidden costs', ['hidden', 'not disclosed', 'surprise', 'didnt know', 'wasn\'t told']),
+        ('free trial issues', ['trial', 'free version', 'limited'])
+    ],
+    '🐛 Bugs/Reliability': [
+        ('crashes frequently', ['crash', 'crashes', 'crashing', 'freeze', 'frozen']),
+        ('data loss', ['lost', 'deleted', 'disappeared', 'missing', 'gone']),
+        ('sync failures', ['sync', 'syncing', 'won\'t sync', 'doesn\'t sync']),
+        ('broken features', ['doesn\'t work', 'not working', 'broken', 'stopped working'])
+    ],
+    '☁️ Sync/Backup': [
+        ('sync doesn\'t work', ['sync', 'syncing', 'won\'t sync']),
+        ('data loss', ['lost', 'disappeared', 'missing']),
+        ('icloud issues', ['icloud', 'cloud']),
+        ('can\'t restore backup', ['restore', 'backup', 'recover'])
+    ],
+    '🎨 UI/UX': [
+        ('confusing interface', ['confusing', 'unclear', 'don\'t understand', 'complicated']),
+        ('hard to navigate', ['navigate', 'navigation', 'find', 'locate']),
+        ('poor design', ['ugly', 'design', 'layout', 'interface']),
+        ('not intuitive', ['not intuitive', 'unintuitive', 'not easy'])
+    ],
+    '⚡ Performance': [
+        ('slow', ['slow', 'sluggish', 'laggy', 'lag']),
+        ('long loading times', ['loading', 'load', 'wait', 'waiting']),
+        ('battery drain', ['battery', 'drain', 'power']),
+        ('freezes', ['freeze', 'frozen', 'stuck', 'hangs'])
+    ],
+    '✨ Features/Functionality': [
+        ('missing features', ['missing', 'need', 'want', 'wish', 'should have']),
+        ('limited options', ['limited', 'can\'t', 'won\'t let me', 'doesn\'t allow']),
+        ('feature requests', ['add', 'please add', 'would be nice']),
+        ('removed features', ['removed', 'used to have', 'no longer'])
+    ],
+    '🔍 Search/Filter': [
+        ('search doesn\'t work', ['search', 'searching', 'can\'t find']),
+        ('poor filtering', ['filter', 'filtering', 'sort', 'sorting']),
+        ('can\'t locate items', ['locate', 'find', 'where is'])
+    ],
+    '📤 Import/Export': [
+        ('export issues', ['export', 'can\'t export', 'won\'t export']),
+        ('import problems', ['import', 'can\'t import']),
+        ('sharing broken', ['share', 'sharing', 'send']),
+        ('pdf generation fails', ['pdf', 'generate'])
+    ],
+    '👥 Multi-device/Sharing': [
+        ('doesn\'t sync across devices', ['devices', 'phone', 'ipad', 'mac', 'tablet']),
+        ('no family sharing', ['family', 'share', 'multiple users']),
+        ('can\'t share with others', ['share', 'sharing', 'collaborate'])
+    ],
+    '🆘 Support/Help': [
+        ('no response from support', ['support', 'no response', 'didn\'t reply', 'contacted']),
+        ('poor documentation', ['help', 'documentation', 'instructions', 'tutorial']),
+        ('unresponsive developer', ['developer', 'team', 'contact'])
+    ]
+}
 
+# Common praise patterns by category
+PRAISE_PATTERNS = {
+    '💰 Pricing/Monetization': [
+        ('good value', ['worth', 'value', 'reasonable', 'fair price']),
+        ('free version sufficient', ['free', 'no cost', 'without paying']),
+        ('one-time purchase', ['one-time', 'one time', 'lifetime'])
+    ],
+    '🐛 Bugs/Reliability': [
+        ('stable and reliable', ['stable', 'reliable', 'never crashes', 'no bugs']),
+        ('works perfectly', ['works', 'working', 'perfect', 'flawless']),
+        ('no data loss', ['safe', 'secure', 'never lost'])
+    ],
+    '☁️ Sync/Backup': [
+        ('sync works great', ['sync', 'syncs', 'syncing', 'seamless']),
+        ('easy backup', ['backup', 'backed up', 'restore']),
+        ('icloud integration', ['icloud', 'cloud'])
+    ],
+    '🎨 UI/UX': [
+        ('intuitive design', ['intuitive', 'easy', 'simple', 'clean']),
+        ('beautiful interface', ['beautiful', 'gorgeous', 'love the design']),
+        ('easy to navigate', ['navigate', 'find', 'organized'])
+    ],
+    '⚡ Performance': [
+        ('fast and responsive', ['fast', 'quick', 'instantly', 'responsive']),
+        ('smooth', ['smooth', 'seamless', 'snappy']),
+        ('efficient', ['efficient', 'optimized'])
+    ],
+    '✨ Features/Functionality': [
+        ('feature-rich', ['features', 'everything', 'complete', 'comprehensive']),
+        ('flexible', ['flexible', 'customizable', 'options']),
+        ('powerful', ['powerful', 'capable', 'advanced'])
+    ],
+    '🔍 Search/Filter': [
+        ('search works great', ['search', 'find', 'easy to find']),
+        ('good filtering', ['filter', 'sort', 'organize'])
+    ],
+    '📤 Import/Export': [
+        ('easy export', ['export', 'download', 'save']),
+        ('sharing works', ['share', 'sharing', 'send']),
+        ('pdf generation', ['pdf', 'report'])
+    ],
+    '👥 Multi-device/Sharing': [
+        ('works on all devices', ['devices', 'phone', 'ipad', 'mac']),
+        ('family sharing', ['family', 'share', 'multiple']),
+        ('cross-platform', ['platform', 'everywhere'])
+    ],
+    '🆘 Support/Help': [
+        ('responsive support', ['support', 'response', 'helpful', 'developer']),
+        ('great documentation', ['help', 'documentation', 'tutorial']),
+        ('active development', ['updates', 'improving', 'developer cares'])
+    ]
+}
 
-def analyze_complaints_and_praise(df):
-    """Analyze complaints and praise with specific issue extraction"""
-    negative_reviews = df[df['rating'] <= 2]['review'].dropna()
-    positive_reviews = df[df['rating'] >= 4]['review'].dropna()
+# Keyword automata per category, built once so each review is scanned in a single pass
+COMPLAINT_AUTOMATA = {
+    category: build_theme_automaton(patterns)
+    for category, patterns in COMPLAINT_PATTERNS.items()
+}
+PRAISE_AUTOMATA = {
+    category: build_theme_automaton(patterns)
+    for category, patterns in PRAISE_PATTERNS.items()
+}
+
+# Patterns that indicate a job statement
+JOB_PATTERNS = [
+    r'(?:I use|I used|We use|We used) (?:this|it|the app) (?:to|for) [^.!?]{20,150}',
+    r'(?:helps? me|helped me) (?:to )?(?:to |with )?[^.!?]{15,150}',
+    r'(?:great|perfect|useful|helpful|ideal) for [^.!?]{15,100}',
+    r'(?:when|whenever) (?:I|we) (?:need to|want to|have to|am|was) [^.!?]{15,150}',
+    r'(?:so I can|so we can|in order to|to help me) [^.!?]{15,100}',
+]
+
+JOB_REGEXES = [re.compile(p, re.IGNORECASE) for p in JOB_PATTERNS]
+
+# All job patterns folded into one alternation to skip reviews with no job statement
+JOB_REGEX = re.compile('|'.join(f'(?:{p})' for p in JOB_PATTERNS), re.IGNORECASE)
+
+
+# Forces of progress keywords; a hit in a review selects its scenario sentence
+PUSH_KEYWORDS = ['cant', 'wont', 'doesnt work', 'broken', 'useless', 'frustrated', 
+                 'annoying', 'terrible', 'waste', 'failed', 'problem', 'issue']
+PULL_KEYWORDS = ['love', 'great', 'perfect', 'exactly', 'finally', 'best', 
+                 'favorite', 'awesome', 'amazing', 'easy', 'simple']
+ANXIETY_KEYWORDS = ['worried', 'concern', 'afraid', 'risk', 'lose', 'lost', 
+                    'scary', 'unsure', 'dont trust', 'what if']
+HABIT_KEYWORDS = ['always', 'used to', 'familiar', 'years', 'long time', 
+                  'accustomed', 'comfortable', 'switch from', 'tried other']
+
+# Outcome pain points (things users complain about)
+PAIN_KEYWORDS = {
+    'Missing features': ['missing', 'need', 'wish', 'want', 'would be nice', 'should have', 'please add'],
+    'Too expensive': ['expensive', 'cost', 'price', 'too much', 'overpriced', 'subscription'],
+    'Doesnt work': ['doesnt work', 'not working', 'broken', 'crashes', 'fails', 'error'],
+    'Confusing': ['confusing', 'complicated', 'hard to', 'difficult', 'dont understand'],
+    'Slow': ['slow', 'laggy', 'takes forever', 'waiting', 'loading'],
+    'Data loss': ['lost', 'disappeared', 'deleted', 'missing', 'gone'],
+    'No sync': ['sync', 'wont sync', 'doesnt sync', 'cloud', 'backup'],
+    'Poor support': ['support', 'no response', 'no help', 'ignored', 'developer']
+}
+
+# Outcome wins (things users love)
+WIN_KEYWORDS = {
+    'Easy to use': ['easy', 'simple', 'intuitive', 'straightforward', 'user-friendly'],
+    'Fast': ['fast', 'quick', 'instant', 'immediately', 'quickly'],
+    'Feature-rich': ['features', 'everything', 'comprehensive', 'complete', 'all I need'],
+    'Reliable': ['reliable', 'stable', 'works great', 'no issues', 'never crashes'],
+    'Good value': ['worth it', 'value', 'reasonable', 'fair price', 'one-time'],
+    'Great support': ['support', 'responsive', 'helpful', 'developer', 'quick response'],
+    'Syncs well': ['sync', 'syncs', 'cloud', 'backup', 'devices'],
+    'Beautiful UI': ['beautiful', 'clean', 'design', 'interface', 'looks great']
+}
+
+# One alternation per outcome theme, matched against lowercase review text
+PAIN_REGEXES = {
+    pain: re.compile('|'.join(re.escape(k) for k in keywords))
+    for pain, keywords in PAIN_KEYWORDS.items()
+}
+WIN_REGEXES = {
+    win: re.compile('|'.join(re.escape(k) for k in keywords))
+    for win, keywords in WIN_KEYWORDS.items()
+}
+
+
+def match_category_sentences(reviews, reviews_lower, review_sentences, keyword_regex, keywords):
+    """
+    Find the reviews mentioning a category and extract the matching sentence
+    Uses one vectorized str.contains pass, then only visits the matched rows
+    """
+    # Passing the pattern text (not the compiled regex) lets Arrow-backed
+    # columns use pyarrow's regex kernel, which runs without holding the GIL
+    mask = reviews.str.contains(keyword_regex.pattern, case=False, na=False)
+    matched = reviews[mask]
+    
+    sentences = []
+    rows = zip(matched, reviews_lower[matched.index], review_sentences[matched.index])
+    for review, review_lower, sentence_table in rows:
+        # The first keyword in FEATURE_PATTERNS order picks the sentence
+        keyword = find_keyword_in_text(review, keywords)
+        if not keyword:
+            continue
+        sentence = extract_complete_sentence(review, keyword, text_lower=review_lower, sentences=sentence_table)
+        if sentence:
+            sentences.append(sentence)
+    
+    return sentences
+
+
+def add_percentages(analysis, count_key, total):
+    """Set each entry's 'percentage' of total, dividing all counts in one NumPy op"""
+    counts = np.array([entry[count_key] for entry in analysis.values()], dtype=np.float64)
+    percentages = counts / max(total, 1) * 100
     
-    complaint_analysis = {}
-    praise_analysis = {}
+    for entry, percentage in zip(analysis.values(), percentages.tolist()):
+        entry['percentage'] = percentage
+
+
+def analyze_category(reviews, reviews_lower, review_sentences, category, keyword_regex, cluster):
+    """Match one feature category against reviews and cluster the hits into themes"""
+    matching_reviews = match_category_sentences(
+        reviews, reviews_lower, review_sentences, keyword_regex, FEATURE_PATTERNS[category]
+    )
+    
+    if len(matching_reviews) == 0:
+        return None
+    
+    return {
+        'total_count': len(matching_reviews),
+        'themes': cluster(matching_reviews, category)
+    }
+
+
+def analyze_complaints_and_praise(negative_reviews, positive_reviews, reviews_lower, review_sentences):
+    """Analyze complaints and praise with specific issue extraction"""
+    # Categories are independent, so scan them concurrently
+    with ThreadPoolExecutor() as executor:
+        complaint_futures = {
+            category: executor.submit(
+                analyze_category, negative_reviews, reviews_lower, review_sentences,
+                category, keyword_regex, cluster_complaints
+            )
+            for category, keyword_regex in FEATURE_REGEXES.items()
+        }
+        praise_futures = {
+            category: executor.submit(
+                analyze_category, positive_reviews, reviews_lower, review_sentences,
+                category, keyword_regex, cluster_praise
+            )
+            for category, keyword_regex in FEATURE_REGEXES.items()
+        }
     
-    # Analyze complaints with clustering
-    for category, keywords in FEATURE_PATTERNS.items():
-        matching_reviews = []
-        
-        for review in negative_reviews:
-            keyword = find_keyword_in_text(review, keywords)
-            if keyword:
-                # Get complete sentence
-                sentence = extract_complete_sentence(review, keyword)
-                if sentence:
-                    matching_reviews.append(sentence)
-        
-        if len(matching_reviews) > 0:
-            # Cluster similar complaints
-            complaint_themes = cluster_complaints(matching_reviews, category)
-            
-            complaint_analysis[category] = {
-                'total_count': len(matching_reviews),
-                'percentage': (len(matching_reviews) / len(negative_reviews)) * 100,
-                'themes': complaint_themes
-            }
+    # Keep only categories with matches, in FEATURE_PATTERNS order
+    complaint_analysis = {
+        category: future.result()
+        for category, future in complaint_futures.items()
+        if future.result() is not None
+    }
+    praise_analysis = {
+        category: future.result()
+        for category, future in praise_futures.items()
+        if future.result() is not None
+    }
     
-    # Analyze praise
-    for category, keywords in FEATURE_PATTERNS.items():
-        matching_reviews = []
-        
-        for review in positive_reviews:
-            keyword = find_keyword_in_text(review, keywords)
-            if keyword:
-                sentence = extract_complete_sentence(review, keyword)
-                if sentence:
-                    matching_reviews.append(sentence)
-        
-        if len(matching_reviews) > 0:
-            praise_themes = cluster_praise(matching_reviews, category)
-            
-            praise_analysis[category] = {
-                'total_count': len(matching_reviews),
-                'percentage': (len(matching_reviews) / len(positive_reviews)) * 100,
-                'themes': praise_themes
-            }
+    add_percentages(complaint_analysis, 'total_count', len(negative_reviews))
+    add_percentages(praise_analysis, 'total_count', len(positive_reviews))
     
     return complaint_analysis, praise_analysis
 
 
-def cluster_complaints(reviews, category):
-    """Cluster complaints into specific themes"""
-    # Common complaint patterns by category
-    complaint_patterns = {
-        '💰 Pricing/Monetization': [
-            ('subscription model', ['subscription', 'recurring', 'monthly', 'yearly', 'one-time', 'one time']),
-            ('price too high', ['expensive', 'too much', 'overpriced', 'cost', 'price']),
-            ('hidden costs', ['hidden', 'not disclosed', 'surprise', 'didnt know', 'wasn\'t told']),
-            ('free trial issues', ['trial', 'free version', 'limited'])
-        ],
-        '🐛 Bugs/Reliability': [
-            ('crashes frequently', ['crash', 'crashes', 'crashing', 'freeze', 'frozen']),
-            ('data loss', ['lost', 'deleted', 'disappeared', 'missing', 'gone']),
-            ('sync failures', ['sync', 'syncing', 'won\'t sync', 'doesn\'t sync']),
-            ('broken features', ['doesn\'t work', 'not working', 'broken', 'stopped working'])
-        ],
-        '☁️ Sync/Backup': [
-            ('sync doesn\'t work', ['sync', 'syncing', 'won\'t sync']),
-            ('data loss', ['lost', 'disappeared', 'missing']),
-            ('icloud issues', ['icloud', 'cloud']),
-            ('can\'t restore backup', ['restore', 'backup', 'recover'])
-        ],
-        '🎨 UI/UX': [
-            ('confusing interface', ['confusing', 'unclear', 'don\'t understand', 'complicated']),
-            ('hard to navigate', ['navigate', 'navigation', 'find', 'locate']),
-            ('poor design', ['ugly', 'design', 'layout', 'interface']),
-            ('not intuitive', ['not intuitive', 'unintuitive', 'not easy'])
-        ],
-        '⚡ Performance': [
-            ('slow', ['slow', 'sluggish', 'laggy', 'lag']),
-            ('long loading times', ['loading', 'load', 'wait', 'waiting']),
-            ('battery drain', ['battery', 'drain', 'power']),
-            ('freezes', ['freeze', 'frozen', 'stuck', 'hangs'])
-        ],
-        '✨ Features/Functionality': [
-            ('missing features', ['missing', 'need', 'want', 'wish', 'should have']),
-            ('limited options', ['limited', 'can\'t', 'won\'t let me', 'doesn\'t allow']),
-            ('feature requests', ['add', 'please add', 'would be nice']),
-            ('removed features', ['removed', 'used to have', 'no longer'])
-        ],
-        '🔍 Search/Filter': [
-            ('search doesn\'t work', ['search', 'searching', 'can\'t find']),
-            ('poor filtering', ['filter', 'filtering', 'sort', 'sorting']),
-            ('can\'t locate items', ['locate', 'find', 'where is'])
-        ],
-        '📤 Import/Export': [
-            ('export issues', ['export', 'can\'t export', 'won\'t export']),
-            ('import problems', ['import', 'can\'t import']),
-            ('sharing broken', ['share', 'sharing', 'send']),
-            ('pdf generation fails', ['pdf', 'generate'])
-        ],
-        '👥 Multi-device/Sharing': [
-            ('doesn\'t sync across devices', ['devices', 'phone', 'ipad', 'mac', 'tablet']),
-            ('no family sharing', ['family', 'share', 'multiple users']),
-            ('can\'t share with others', ['share', 'sharing', 'collaborate'])
-        ],
-        '🆘 Support/Help': [
-            ('no response from support', ['support', 'no response', 'didn\'t reply', 'contacted']),
-            ('poor documentation', ['help', 'documentation', 'instructions', 'tutorial']),
-            ('unresponsive developer', ['developer', 'team', 'contact'])
-        ]
-    }
+def match_themes(reviews, patterns, automaton):
+    """Bucket reviews under every theme whose keywords they mention"""
+    theme_matches = [[] for _ in patterns]
+    
+    for review in reviews:
+        # Single automaton pass finds every theme keyword in the review
+        matched_themes = set()
+        for _, theme_indices in automaton.iter(review.lower()):
+            matched_themes.update(theme_indices)
+        
+        for idx in matched_themes:
+            theme_matches[idx].append(review)
     
     themes = []
-    patterns = complaint_patterns.get(category, [])
-    
-    for theme_name, theme_keywords in patterns:
-        matching = []
-        for review in reviews:
-            review_lower = review.lower()
-            if any(kw in review_lower for kw in theme_keywords):
-                matching.append(review)
-        
+    for (theme_name, _), matching in zip(patterns, theme_matches):
         if len(matching) > 0:
             themes.append({
                 'name': theme_name,
@@ -166,80 +310,18 @@ def cluster_complaints(reviews, category):
     return themes[:5]  # Top 5 themes
 
 
+def cluster_complaints(reviews, category):
+    """Cluster complaints into specific themes"""
+    if category not in COMPLAINT_PATTERNS:
+        return []
+    return match_themes(reviews, COMPLAINT_PATTERNS[category], COMPLAINT_AUTOMATA[category])
+
+
 def cluster_praise(reviews, category):
     """Cluster praise into specific themes"""
-    # Common praise patterns by category
-    praise_patterns = {
-        '💰 Pricing/Monetization': [
-            ('good value', ['worth', 'value', 'reasonable', 'fair price']),
-            ('free version sufficient', ['free', 'no cost', 'without paying']),
-            ('one-time purchase', ['one-time', 'one time', 'lifetime'])
-        ],
-        '🐛 Bugs/Reliability': [
-            ('stable and reliable', ['stable', 'reliable', 'never crashes', 'no bugs']),
-            ('works perfectly', ['works', 'working', 'perfect', 'flawless']),
-            ('no data loss', ['safe', 'secure', 'never lost'])
-        ],
-        '☁️ Sync/Backup': [
-            ('sync works great', ['sync', 'syncs', 'syncing', 'seamless']),
-            ('easy backup', ['backup', 'backed up', 'restore']),
-            ('icloud integration', ['icloud', 'cloud'])
-        ],
-        '🎨 UI/UX': [
-            ('intuitive design', ['intuitive', 'easy', 'simple', 'clean']),
-            ('beautiful interface', ['beautiful', 'gorgeous', 'love the design']),
-            ('easy to navigate', ['navigate', 'find', 'organized'])
-        ],
-        '⚡ Performance': [
-            ('fast and responsive', ['fast', 'quick', 'instantly', 'responsive']),
-            ('smooth', ['smooth', 'seamless', 'snappy']),
-            ('efficient', ['efficient', 'optimized'])
-        ],
-        '✨ Features/Functionality': [
-            ('feature-rich', ['features', 'everything', 'complete', 'comprehensive']),
-            ('flexible', ['flexible', 'customizable', 'options']),
-            ('powerful', ['powerful', 'capable', 'advanced'])
-        ],
-        '🔍 Search/Filter': [
-            ('search works great', ['search', 'find', 'easy to find']),
-            ('good filtering', ['filter', 'sort', 'organize'])
-        ],
-        '📤 Import/Export': [
-            ('easy export', ['export', 'download', 'save']),
-            ('sharing works', ['share', 'sharing', 'send']),
-            ('pdf generation', ['pdf', 'report'])
-        ],
-        '👥 Multi-device/Sharing': [
-            ('works on all devices', ['devices', 'phone', 'ipad', 'mac']),
-            ('family sharing', ['family', 'share', 'multiple']),
-            ('cross-platform', ['platform', 'everywhere'])
-        ],
-        '🆘 Support/Help': [
-            ('responsive support', ['support', 'response', 'helpful', 'developer']),
-            ('great documentation', ['help', 'documentation', 'tutorial']),
-            ('active development', ['updates', 'improving', 'developer cares'])
-        ]
-    }
-    
-    themes = []
-    patterns = praise_patterns.get(category, [])
-    
-    for theme_name, theme_keywords in patterns:
-        matching = []
-        for review in reviews:
-            review_lower = review.lower()
-            if any(kw in review_lower for kw in theme_keywords):
-                matching.append(review)
-        
-        if len(matching) > 0:
-            themes.append({
-                'name': theme_name,
-                'count': len(matching),
-                'examples': matching[:3]
-            })
-    
-    themes.sort(key=lambda x: x['count'], reverse=True)
-    return themes[:5]
+    if category not in PRAISE_PATTERNS:
+        return []
+    return match_themes(reviews, PRAISE_PATTERNS[category], PRAISE_AUTOMATA[category])
 
 
 def extract_jtbds_from_reviews(reviews, limit=100):
@@ -247,236 +329,229 @@ def extract_jtbds_from_reviews(reviews, limit=100):
     Extract JTBD statements verbatim from reviews
     Look for clear job statements users naturally express
     """
-    jtbd_statements = []
-    
-    # Patterns that indicate a job statement
-    job_patterns = [
-        r'(I use|I used|We use|We used) (this|it|the app) (to|for) ([^.!?]{20,150})',
-        r'(helps? me|helped me) (to )?(to |with )?([^.!?]{15,150})',
-        r'(great|perfect|useful|helpful|ideal) for ([^.!?]{15,100})',
-        r'(when|whenever) (I|we) (need to|want to|have to|am|was) ([^.!?]{15,150})',
-        r'(so I can|so we can|in order to|to help me) ([^.!?]{15,100})',
-    ]
+    reviews = reviews.head(limit)
+    candidates = reviews[reviews.str.contains(JOB_REGEX, na=False)]
     
-    for review in reviews.head(limit):
-        review_text = str(review)
-        
-        # Try each pattern
-        for pattern in job_patterns:
-            matches = re.finditer(pattern, review_text, re.IGNORECASE)
-            for match in matches:
-                # Get the full sentence containing this match
-                sentences = re.split(r'(?<=[.!?])\s+', review_text)
-                for sentence in sentences:
-                    if match.group(0).lower() in sentence.lower():
-                        # Clean and store
-                        clean_sentence = sentence.strip()
-                        if 20 < len(clean_sentence) < 300:
-                            jtbd_statements.append({
-                                'statement': clean_sentence,
-                                'full_review': review_text[:300]
-                            })
-                        break
-                break
-    
-    # Deduplicate very similar statements
     unique_jtbds = []
     seen_starts = set()
     
-    for jtbd in jtbd_statements:
-        # Use first 30 chars as uniqueness check
-        start = jtbd['statement'][:30].lower()
-        if start not in seen_starts:
-            unique_jtbds.append(jtbd)
-            seen_starts.add(start)
-    
-    return unique_jtbds[:10]  # Top 10 clearest statements
+    for review_text in candidates:
+        sentences = SENTENCE_SPLIT_REGEX.split(review_text)
+        
+        # Only the first match of each pattern counts, in pattern order
+        for regex in JOB_REGEXES:
+            match = regex.search(review_text)
+            if not match:
+                continue
+            
+            # Get the full sentence containing this match
+            match_lower = match.group(0).lower()
+            sentence = next((s for s in sentences if match_lower in s.lower()), '').strip()
+            
+            # Use first 30 chars as uniqueness check
+            start = sentence[:30].lower()
+            if 20 < len(sentence) < 300 and start not in seen_starts:
+                unique_jtbds.append({
+                    'statement': sentence,
+                    'full_review': review_text[:300]
+                })
+                seen_starts.add(start)
+                if len(unique_jtbds) == 10:  # Top 10 clearest statements
+                    return unique_jtbds
+    
+    return unique_jtbds
 
 
-def analyze_forces_of_progress(df):
+def collect_force_scenarios(reviews, reviews_lower, review_sentences, keywords):
+    """Collect one scenario sentence per review that mentions a force keyword"""
+    keywords = tuple(keywords)
+    automaton = keyword_list_automaton(keywords)
+    
+    scenarios = []
+    rows = zip(reviews, reviews_lower[reviews.index], review_sentences[reviews.index])
+    for review, review_lower, sentence_table in rows:
+        # One pass finds every keyword present; try them in list order until
+        # one sits in a substantial sentence
+        priorities = sorted({priority for _, priority in automaton.iter(review_lower)})
+        for priority in priorities:
+            sentence = extract_complete_sentence(
+                review, keywords[priority], max_length=250, text_lower=review_lower, sentences=sentence_table
+            )
+            if sentence and len(sentence) > 30:
+                scenarios.append(sentence)
+                break
+    return scenarios
+
+
+def analyze_forces_of_progress(negative_reviews, positive_reviews, all_reviews, reviews_lower, review_sentences):
     """
     Analyze forces with feature-specific context
     Focus on WHAT specifically drives each force
     """
-    negative_reviews = df[df['rating'] <= 2]['review'].dropna()
-    positive_reviews = df[df['rating'] >= 4]['review'].dropna()
-    all_reviews = df['review'].dropna()
-    
     forces_analysis = {}
     
     # Push: What's failing with current solutions
-    push_scenarios = []
-    push_keywords = ['cant', 'wont', 'doesnt work', 'broken', 'useless', 'frustrated', 
-                     'annoying', 'terrible', 'waste', 'failed', 'problem', 'issue']
-    
-    for review in negative_reviews:
-        review_lower = str(review).lower()
-        for keyword in push_keywords:
-            if keyword in review_lower:
-                sentence = extract_complete_sentence(review, keyword, max_length=250)
-                if sentence and len(sentence) > 30:
-                    push_scenarios.append(sentence)
-                    break
+    push_scenarios = collect_force_scenarios(negative_reviews, reviews_lower, review_sentences, PUSH_KEYWORDS)
     
     if len(push_scenarios) > 0:
         forces_analysis['push'] = {
             'label': '🔴 Push (Current Solution Fails)',
             'count': len(push_scenarios),
-            'scenarios': list(set(push_scenarios))[:5],
+            'scenarios': first_unique(push_scenarios, 5),
             'insight': f"{len(push_scenarios)} mentions of current solution failures"
         }
     
     # Pull: What attracts them to THIS solution specifically
-    pull_scenarios = []
-    pull_keywords = ['love', 'great', 'perfect', 'exactly', 'finally', 'best', 
-                     'favorite', 'awesome', 'amazing', 'easy', 'simple']
-    
-    for review in positive_reviews:
-        review_lower = str(review).lower()
-        for keyword in pull_keywords:
-            if keyword in review_lower:
-                sentence = extract_complete_sentence(review, keyword, max_length=250)
-                if sentence and len(sentence) > 30:
-                    pull_scenarios.append(sentence)
-                    break
+    pull_scenarios = collect_force_scenarios(positive_reviews, reviews_lower, review_sentences, PULL_KEYWORDS)
     
     if len(pull_scenarios) > 0:
         forces_analysis['pull'] = {
             'label': '🟢 Pull (Why This App)',
             'count': len(pull_scenarios),
-            'scenarios': list(set(pull_scenarios))[:5],
+            'scenarios': first_unique(pull_scenarios, 5),
             'insight': f"{len(pull_scenarios)} mentions of specific attractions"
         }
     
     # Anxiety: Fears about switching/adoption
-    anxiety_scenarios = []
-    anxiety_keywords = ['worried', 'concern', 'afraid', 'risk', 'lose', 'lost', 
-                       'scary', 'unsure', 'dont trust', 'what if']
-    
-    for review in all_reviews:
-        review_lower = str(review).lower()
-        for keyword in anxiety_keywords:
-            if keyword in review_lower:
-                sentence = extract_complete_sentence(review, keyword, max_length=250)
-                if sentence and len(sentence) > 30:
-                    anxiety_scenarios.append(sentence)
-                    break
+    anxiety_scenarios = collect_force_scenarios(all_reviews, reviews_lower, review_sentences, ANXIETY_KEYWORDS)
     
     if len(anxiety_scenarios) > 0:
         forces_analysis['anxiety'] = {
             'label': '🟡 Anxiety (Switching Fears)',
             'count': len(anxiety_scenarios),
-            'scenarios': list(set(anxiety_scenarios))[:5],
+            'scenarios': first_unique(anxiety_scenarios, 5),
             'insight': f"{len(anxiety_scenarios)} mentions of concerns/fears"
         }
     
     # Habit: Inertia/status quo
-    habit_scenarios = []
-    habit_keywords = ['always', 'used to', 'familiar', 'years', 'long time', 
-                     'accustomed', 'comfortable', 'switch from', 'tried other']
-    
-    for review in all_reviews:
-        review_lower = str(review).lower()
-        for keyword in habit_keywords:
-            if keyword in review_lower:
-                sentence = extract_complete_sentence(review, keyword, max_length=250)
-                if sentence and len(sentence) > 30:
-                    habit_scenarios.append(sentence)
-                    break
+    habit_scenarios = collect_force_scenarios(all_reviews, reviews_lower, review_sentences, HABIT_KEYWORDS)
     
     if len(habit_scenarios) > 0:
         forces_analysis['habit'] = {
             'label': '🔵 Habit (Status Quo)',
             'count': len(habit_scenarios),
-            'scenarios': list(set(habit_scenarios))[:5],
+            'scenarios': first_unique(habit_scenarios, 5),
             'insight': f"{len(habit_scenarios)} mentions of past solutions/habits"
         }
     
     return forces_analysis
 
 
-def analyze_outcomes(df):
+def analyze_outcomes(negative_reviews, positive_reviews, reviews_lower, review_sentences):
     """
     Simplified outcome analysis: top pain points and wins
     Skip ODI format, just show what matters with counts
     """
-    all_reviews = df['review'].dropna()
-    negative_reviews = df[df['rating'] <= 2]['review'].dropna()
-    positive_reviews = df[df['rating'] >= 4]['review'].dropna()
-    
     # Pain points (things users complain about)
     pain_points = {}
-    pain_keywords = {
-        'Missing features': ['missing', 'need', 'wish', 'want', 'would be nice', 'should have', 'please add'],
-        'Too expensive': ['expensive', 'cost', 'price', 'too much', 'overpriced', 'subscription'],
-        'Doesnt work': ['doesnt work', 'not working', 'broken', 'crashes', 'fails', 'error'],
-        'Confusing': ['confusing', 'complicated', 'hard to', 'difficult', 'dont understand'],
-        'Slow': ['slow', 'laggy', 'takes forever', 'waiting', 'loading'],
-        'Data loss': ['lost', 'disappeared', 'deleted', 'missing', 'gone'],
-        'No sync': ['sync', 'wont sync', 'doesnt sync', 'cloud', 'backup'],
-        'Poor support': ['support', 'no response', 'no help', 'ignored', 'developer']
-    }
-    
-    for pain, keywords in pain_keywords.items():
+    for pain, keyword_regex in PAIN_REGEXES.items():
         examples = []
-        for review in negative_reviews:
-            review_lower = str(review).lower()
-            for keyword in keywords:
-                if keyword in review_lower:
-                    sentence = extract_complete_sentence(review, keyword, max_length=200)
-                    if sentence:
-                        examples.append(sentence)
-                    break
+        rows = zip(negative_reviews, reviews_lower[negative_reviews.index], review_sentences[negative_reviews.index])
+        for review, review_lower, sentence_table in rows:
+            match = keyword_regex.search(review_lower)
+            if match:
+                sentence = extract_complete_sentence(
+                    review, match.group(0), max_length=200, text_lower=review_lower, sentences=sentence_table
+                )
+                if sentence:
+                    examples.append(sentence)
         
         if len(examples) > 0:
             pain_points[pain] = {
                 'count': len(examples),
-                'percentage': (len(examples) / len(negative_reviews)) * 100,
-                'examples': list(set(examples))[:3]
+                'examples': first_unique(examples, 3)
             }
     
     # Wins (things users love)
     wins = {}
-    win_keywords = {
-        'Easy to use': ['easy', 'simple', 'intuitive', 'straightforward', 'user-friendly'],
-        'Fast': ['fast', 'quick', 'instant', 'immediately', 'quickly'],
-        'Feature-rich': ['features', 'everything', 'comprehensive', 'complete', 'all I need'],
-        'Reliable': ['reliable', 'stable', 'works great', 'no issues', 'never crashes'],
-        'Good value': ['worth it', 'value', 'reasonable', 'fair price', 'one-time'],
-        'Great support': ['support', 'responsive', 'helpful', 'developer', 'quick response'],
-        'Syncs well': ['sync', 'syncs', 'cloud', 'backup', 'devices'],
-        'Beautiful UI': ['beautiful', 'clean', 'design', 'interface', 'looks great']
-    }
-    
-    for win, keywords in win_keywords.items():
+    for win, keyword_regex in WIN_REGEXES.items():
         examples = []
-        for review in positive_reviews:
-            review_lower = str(review).lower()
-            for keyword in keywords:
-                if keyword in review_lower:
-                    sentence = extract_complete_sentence(review, keyword, max_length=200)
-                    if sentence:
-                        examples.append(sentence)
-                    break
+        rows = zip(positive_reviews, reviews_lower[positive_reviews.index], review_sentences[positive_reviews.index])
+        for review, review_lower, sentence_table in rows:
+            match = keyword_regex.search(review_lower)
+            if match:
+                sentence = extract_complete_sentence(
+                    review, match.group(0), max_length=200, text_lower=review_lower, sentences=sentence_table
+                )
+                if sentence:
+                    examples.append(sentence)
         
         if len(examples) > 0:
             wins[win] = {
                 'count': len(examples),
-                'percentage': (len(examples) / len(positive_reviews)) * 100,
-                'examples': list(set(examples))[:3]
+                'examples': first_unique(examples, 3)
             }
     
+    add_percentages(pain_points, 'count', len(negative_reviews))
+    add_percentages(wins, 'count', len(positive_reviews))
+    
     return pain_points, wins
 
 
+@st.cache_data(show_spinner=False)
+def compute_free_analysis(df):
+    """
+    Run every free analysis on the reviews and return the results
+    Cached on the DataFrame contents, so reruns skip the computation
+    """
+    # Arrow-backed strings let the .str passes below run on native kernels
+    reviews = df['review'].astype('string[pyarrow]')
+    
+    # Slice reviews by rating once and share the slices across all analyses.
+    # Plain NumPy masks over the single review column: no full-width frames
+    ratings = df['rating'].to_numpy()
+    has_review = reviews.notna().to_numpy()
+    negative_mask = ratings <= 2
+    neutral_mask = ratings == 3
+    positive_mask = ratings >= 4
+    
+    all_reviews = reviews[has_review]
+    negative_reviews = reviews[negative_mask & has_review]
+    positive_reviews = reviews[positive_mask & has_review]
+    
+    # Lowercase and sentence-split every review once and share them across all analysis passes
+    reviews_lower = reviews.str.lower()
+    review_sentences = all_reviews.map(split_sentences)
+    
+    complaint_analysis, praise_analysis = analyze_complaints_and_praise(
+        negative_reviews, positive_reviews, reviews_lower, review_sentences
+    )
+    
+    return {
+        'complaints': complaint_analysis,
+        'praise': praise_analysis,
+        'jtbds': extract_jtbds_from_reviews(positive_reviews, limit=100),
+        'forces': analyze_forces_of_progress(
+            negative_reviews, positive_reviews, all_reviews, reviews_lower, review_sentences
+        ),
+        'samples': {
+            'positive': df.iloc[np.flatnonzero(positive_mask)[:5]],
+            'neutral': df.iloc[np.flatnonzero(neutral_mask)[:5]],
+            'negative': df.iloc[np.flatnonzero(negative_mask)[:5]]
+        }
+    }
+
+
+def render_sample_reviews(sample):
+    """Render sample reviews as expanders, reading whole columns rather than per-row Series"""
+    rows = zip(
+        sample['rating'], sample['title'], sample['review'],
+        sample['author'], sample['date'], sample['version']
+    )
+    for rating, title, review, author, date, version in rows:
+        title = title[:50] if title else "No title"
+        with st.expander(f"⭐ {rating} - {title}"):
+            st.markdown(review)
+            st.caption(f"👤 {author} • 📅 {date} • 📱 v{version}")
+
+
 def run_free_analysis(df):
     """Main function to run all free analysis and display results - Improved UI"""
     
-    # Add sentiment column
-    df['text_sentiment'] = df['review'].apply(get_sentiment)
-    
     # Run all analyses upfront
-    complaint_analysis, praise_analysis = analyze_complaints_and_praise(df)
+    results = compute_free_analysis(df)
+    complaint_analysis = results['complaints']
+    praise_analysis = results['praise']
     
     # === EXECUTIVE SUMMARY (Key Insights at Top) ===
     st.markdown("## 💡 Executive Summary")
@@ -557,8 +632,7 @@ def run_free_analysis(df):
     with tab3:
         st.caption("What progress are users trying to make?")
         
-        positive_reviews = df[df['rating'] >= 4]['review'].dropna()
-        jtbd_statements = extract_jtbds_from_reviews(positive_reviews, limit=100)
+        jtbd_statements = results['jtbds']
         
         if len(jtbd_statements) > 0:
             st.markdown(f"**Found {len(jtbd_statements)} clear job statements:**")
@@ -574,7 +648,7 @@ def run_free_analysis(df):
     with tab4:
         st.caption("What drives users toward or away from this app")
         
-        forces_analysis = analyze_forces_of_progress(df)
+        forces_analysis = results['forces']
         
         force_order = ['push', 'pull', 'anxiety', 'habit']
         for force in force_order:
@@ -596,31 +670,18 @@ def run_free_analysis(df):
         tab_pos, tab_neu, tab_neg = st.tabs(["Positive (4-5★)", "Neutral (3★)", "Negative (1-2★)"])
         
         with tab_pos:
-            positive_revs = df[df['rating'] >= 4].head(5)
-            for _, review in positive_revs.iterrows():
-                title = review['title'][:50] if review['title'] else "No title"
-                with st.expander(f"⭐ {review['rating']} - {title}"):
-                    st.markdown(review['review'])
-                    st.caption(f"👤 {review['author']} • 📅 {review['date']} • 📱 v{review['version']}")
+            render_sample_reviews(results['samples']['positive'])
         
         with tab_neu:
-            neutral_revs = df[df['rating'] == 3].head(5)
+            neutral_revs = results['samples']['neutral']
             if len(neutral_revs) > 0:
-                for _, review in neutral_revs.iterrows():
-                    title = review['title'][:50] if review['title'] else "No title"
-                    with st.expander(f"⭐ 3 - {title}"):
-                        st.markdown(review['review'])
-                        st.caption(f"👤 {review['author']} • 📅 {review['date']} • 📱 v{review['version']}")
+                render_sample_reviews(neutral_revs)
             else:
                 st.info("No neutral reviews found")
         
         with tab_neg:
-            negative_revs = df[df['rating'] <= 2].head(5)
+            negative_revs = results['samples']['negative']
             if len(negative_revs) > 0:
-                for _, review in negative_revs.iterrows():
-                    title = review['title'][:50] if review['title'] else "No title"
-                    with st.expander(f"⭐ {review['rating']} - {title}"):
-                        st.markdown(review['review'])
-                        st.caption(f"👤 {review['author']} • 📅 {review['date']} • 📱 v{review['version']}")
+                render_sample_reviews(negative_revs)
             else:
-                st.info("No negative reviews found")
\ No newline at end of file
+                st.info("No negative reviews found")
@@ -1,7 +1,12 @@
 import streamlit as st
-import os
+import hashlib
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
-import plotly.graph_objects as go
 
 from utils import extract_app_id
 from scraper import scrape_app_reviews, get_app_metadata
@@ -34,16 +39,82 @@ SPACING = {
     'xxl': '3rem',
 }
 
-# Page config
-st.set_page_config(
-    page_title="AppScope - App Store Analytics",
-    page_icon="🔍",
-    layout="wide",
-    initial_sidebar_state="expanded"
+MAX_PAGES = 10  # App Store RSS pages per scrape, 50 reviews each
+
+TEXT_COLUMNS = ['title', 'review', 'author', 'version', 'date']
+
+STAR_LABELS = ['⭐' * stars for stars in range(1, 6)]
+
+RATING_COLORS = ['#DC2626', '#F97316', '#EAB308', '#84CC16', '#22C55E']
+
+PROGRESS_UPDATE_INTERVAL = 0.5  # seconds between scrape progress redraws
+
+AI_CACHE_MAX_ENTRIES = 32  # cached AI reports kept across sessions
+
+# plotly and anthropic are imported where they are first used, keeping them off
+# the cold-start path; only check here whether the optional AI dependency exists
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+
+HEADER_HTML = (
+    '<h1 class="main-header">🔍 AppScope</h1>'
+    '<p class="subtitle">Deep insights from App Store reviews in minutes</p>'
 )
 
-# Professional CSS Theme  
-st.markdown(f"""
+AI_PROMPT_TEMPLATE = """Analyze these app reviews and provide structured insights for a product manager:
+
+POSITIVE REVIEWS (4-5 stars):
+{positive_block}
+
+NEGATIVE REVIEWS (1-2 stars):
+{negative_block}
+
+Provide a structured analysis:
+
+## 1. CRITICAL JOBS TO BE DONE (2-4 only)
+Identify HIGH-STAKES jobs users are hiring this app for. Requirements for each job:
+- Must have 5+ mentions OR be high-stakes (insurance claims, moving, estate planning, disaster recovery)
+- Show clear BEFORE/AFTER pain point being solved
+- Be specific enough to build features for
+
+DO NOT include:
+- Generic feature usage like "organize belongings" or "track items" (that's what the app does, not a job)
+- Vague goals like "stay organized" or "manage stuff"
+
+Format each as:
+- **Specific Job Title** | Mentions: X | Stakes: [High/Critical] | Quote: "..." | So What: [why this matters to users]
+
+Example GOOD job: "Maximize insurance payout after home disaster by proving ownership with photos and values"
+Example BAD job: "Organize and track home belongings" (too generic)
+
+## 2. TOP 5 FEATURES USERS LOVE
+Format:
+- **Feature** | Mentions: X | Why: [explanation] | Quote: "..." | Recommendation: [how to leverage this]
+
+## 3. TOP 5 CRITICAL COMPLAINTS
+Focus on complaints that cause churn or block adoption. Format:
+- **Issue** | Mentions: X | Impact: [Churn/Blocker/Friction] | Quote: "..." | Fix Priority: [P0/P1/P2]
+
+## 4. COMPETITIVE POSITIONING
+Based on what users say about alternatives or comparisons:
+- What makes this app unique vs. competitors mentioned?
+- What do users wish this app had from competitors?
+- Where is this app vulnerable?
+
+## 5. SURPRISING INSIGHTS
+2-3 non-obvious patterns that would change product strategy:
+- Unexpected use cases or user segments
+- Counter-intuitive behavior patterns
+- Hidden opportunities
+
+End each section with actionable "So What?" implications for the product team."""
+
+
+@st.cache_resource
+def build_theme_css():
+    """
+    Format the theme stylesheet once per process; each rerun only re-sends the string
+    """
+    return f"""
 <style>
     /* Light main background */
     .main .block-container {{
@@ -116,11 +187,383 @@ st.markdown(f"""
         color: {COLORS['primary']} !important;
     }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+def select_example(url):
+    """
+    Fill the URL input from an example button; runs before the rerun, so no st.rerun() is needed
+    """
+    st.session_state['app_url'] = url
+
+
+@st.cache_resource(show_spinner=False)
+def get_anthropic_client(api_key):
+    """
+    Reuse one Anthropic client (and its connection pool) per API key
+    """
+    import anthropic
+    
+    return anthropic.Anthropic(api_key=api_key)
+
+
+@st.cache_resource(ttl=86400, show_spinner=False)
+def ai_response_cache():
+    """
+    Shared {ai_cache_key(): report} store, so re-running the same analysis is free
+    An OrderedDict instead of st.cache_data because the live response is streamed;
+    the oldest reports are evicted past AI_CACHE_MAX_ENTRIES. Every session thread
+    shares it, so it comes with a lock that guards all reads and writes
+    """
+    return threading.Lock(), OrderedDict()
+
+
+def ai_cache_key(api_key, prompt):
+    """Cache key for an AI report, holding a hash of the API key rather than the key itself"""
+    return hashlib.sha256(api_key.encode()).hexdigest(), prompt
+
+
+def get_cached_report(cache_key):
+    """Return the cached AI report for cache_key, or None"""
+    lock, reports = ai_response_cache()
+    with lock:
+        analysis = reports.get(cache_key)
+        if analysis is not None:
+            reports.move_to_end(cache_key)
+    return analysis
+
+
+def store_cached_report(cache_key, analysis):
+    """Cache an AI report, evicting the least recently used ones past the cap"""
+    lock, reports = ai_response_cache()
+    with lock:
+        reports[cache_key] = analysis
+        while len(reports) > AI_CACHE_MAX_ENTRIES:
+            reports.popitem(last=False)
+
+
+def downcast_reviews(df):
+    """
+    Store ratings as int8 and text columns as Arrow-backed strings
+    """
+    if df.empty:
+        return df
+    text_columns = [c for c in TEXT_COLUMNS if c in df.columns]
+    return df.astype({'rating': 'int8', **{c: 'string[pyarrow]' for c in text_columns}})
+
+
+def load_reviews(app_id):
+    """
+    Scrape reviews for an app with a progress bar
+    Feed pages are cached in scraper.py, so repeat scrapes skip the network
+    """
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    last_update = [0.0]
+
+    def progress_callback(page, status):
+        # Coalesce updates so fast pages don't each cost two websocket messages
+        now = time.monotonic()
+        if now - last_update[0] < PROGRESS_UPDATE_INTERVAL:
+            return
+        last_update[0] = now
+        progress_bar.progress(page * 10)
+        status_text.text(status)
+
+    df = scrape_app_reviews(app_id, max_pages=MAX_PAGES, progress_callback=progress_callback)
+
+    progress_bar.progress(100)
+    status_text.text("✅ Scraping complete!")
+    return downcast_reviews(df)
+
+
+@st.cache_data(show_spinner=False)
+def csv_bytes(df):
+    """
+    Serialize reviews for the CSV download once per dataset
+    """
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def split_by_rating(df):
+    """
+    Partition reviews into negative (<=2), neutral (3) and positive (>=4) buckets
+    One stable sort on the bucket code keeps every bucket in scrape order
+    """
+    codes = np.searchsorted([3, 4], df['rating'].to_numpy(), side='right')
+    ordered = df.iloc[np.argsort(codes, kind='stable')]
+    neutral_start, positive_start = np.cumsum(np.bincount(codes, minlength=3))[:2]
+    return {
+        'neg': ordered.iloc[:neutral_start],
+        'neu': ordered.iloc[neutral_start:positive_start],
+        'pos': ordered.iloc[positive_start:],
+    }
+
+
+def build_prompt_blocks(buckets, sample_size=30):
+    """
+    Build the bulleted positive/negative review blocks for the AI prompt
+    Also returns the character count used for the cost estimate
+    """
+    blocks = {'chars': 0}
+    for key in ('pos', 'neg'):
+        texts = buckets[key]['review_short'].head(sample_size).dropna()
+        blocks['chars'] += texts.str.len().sum()
+        blocks[key] = ("- " + texts).str.cat(sep='\n')
+    return blocks
+
+
+@st.cache_data(show_spinner=False)
+def rating_histogram(ratings):
+    """
+    Count reviews per star rating (1-5), cached on the rating column alone
+    One bincount pass; bin 0 holds unrated reviews and is dropped
+    """
+    counts = np.bincount(ratings.to_numpy(), minlength=6)[1:6]
+    return pd.Series(counts, index=range(1, 6))
+
+
+@st.cache_data(show_spinner=False)
+def build_rating_figure(counts):
+    """
+    Build the rating distribution bar chart from the 1-5 star counts
+    Cached on the counts tuple, so reruns reuse the figure
+    """
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=STAR_LABELS,
+            y=counts,
+            marker_color=RATING_COLORS,
+            text=counts,
+            textposition='outside',
+            hovertemplate='<b>%{x}</b><br>%{y} reviews<extra></extra>'
+        )
+    ])
+
+    fig.update_layout(
+        title=None,
+        xaxis_title=None,
+        yaxis_title="Number of Reviews",
+        height=350,
+        margin=dict(t=20, b=40, l=60, r=20),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter, sans-serif", size=12),
+        xaxis=dict(tickfont=dict(size=14)),
+        yaxis=dict(gridcolor='#E5E7EB', gridwidth=1),
+    )
+    
+    return fig
+
+
+@st.fragment
+def render_stats(df, app_metadata):
+    """
+    Render quick stats and the rating distribution chart
+    """
+    # One pass over the ratings; every stat below is derived from this histogram
+    rating_counts = rating_histogram(df['rating'])
+    total_rated = len(df)
+    avg_rating = (rating_counts * rating_counts.index).sum() / total_rated
+
+    # Quick Stats
+    st.markdown("### 📊 Quick Stats")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        # Show total reviews from App Store, not just scraped
+        total = app_metadata.get('total_reviews', 0)
+        if total:
+            st.metric("Total Reviews", f"{total:,}")
+            st.caption(f"Analyzed: {len(df):,}")
+        else:
+            st.metric("Analyzed Reviews", f"{len(df):,}")
+
+    with col2:
+        # Show overall App Store rating, not average of scraped
+        overall_rating = app_metadata.get('overall_rating')
+        if overall_rating:
+            st.metric("App Store Rating", f"{overall_rating:.1f} ⭐")
+            st.caption(f"Recent avg: {avg_rating:.1f}⭐")
+        else:
+            st.metric("Average Rating", f"{avg_rating:.1f} ⭐")
+
+    with col3:
+        positive_pct = rating_counts[[4, 5]].sum() / total_rated * 100
+        st.metric("Positive", f"{positive_pct:.0f}%")
+
+    with col4:
+        negative_pct = rating_counts[[1, 2]].sum() / total_rated * 100
+        st.metric("Negative", f"{negative_pct:.0f}%")
+
+    st.markdown("")  # Spacing
+
+    # Rating distribution with Plotly
+    st.markdown("📈 Rating Distribution")
+
+    fig = build_rating_figure(tuple(rating_counts.tolist()))
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def render_samples(df, buckets):
+    """
+    Render sample review tabs and the CSV download
+    """
+    tab1, tab2, tab3 = st.tabs(["😊 Positive (4-5 ⭐)", "😐 Neutral (3 ⭐)", "😞 Negative (1-2 ⭐)"])
+    
+    with tab1:
+        positive = buckets['pos'].head(10)
+        if len(positive) == 0:
+            st.info("No positive reviews found")
+        else:
+            for position, row in enumerate(positive.itertuples(index=False)):
+                with st.expander(f"⭐ {row.rating} stars - {row.title}", expanded=(position == 0)):
+                    st.write(row.review)
+                    st.caption(f"👤 **{row.author}** • 📅 {row.date_short} • 📱 Version {row.version}")
+    
+    with tab2:
+        neutral = buckets['neu'].head(10)
+        if len(neutral) == 0:
+            st.info("No neutral reviews found")
+        else:
+            for position, row in enumerate(neutral.itertuples(index=False)):
+                with st.expander(f"⭐ {row.rating} stars - {row.title}", expanded=(position == 0)):
+                    st.write(row.review)
+                    st.caption(f"👤 **{row.author}** • 📅 {row.date_short} • 📱 Version {row.version}")
+    
+    with tab3:
+        negative = buckets['neg'].head(10)
+        if len(negative) == 0:
+            st.info("No negative reviews found")
+        else:
+            for position, row in enumerate(negative.itertuples(index=False)):
+                with st.expander(f"⭐ {row.rating} stars - {row.title}", expanded=(position == 0)):
+                    st.write(row.review)
+                    st.caption(f"👤 **{row.author}** • 📅 {row.date_short} • 📱 Version {row.version}")
+    
+    st.markdown("---")
+    st.download_button(
+        "📥 Download Full Dataset (CSV)",
+        csv_bytes(df),
+        "reviews.csv",
+        "text/csv",
+        use_container_width=True
+    )
+
+
+def render_insights(df, analysis_mode, api_key):
+    """
+    Render the Deep Insights section for the selected analysis mode
+    """
+    st.markdown("---")
+    st.markdown("### 🤖 Deep Insights")
+    
+    if analysis_mode == "🆓 Free (Basic)":
+        if st.button("🚀 Run Free Analysis", use_container_width=True):
+            with st.spinner("Analyzing reviews..."):
+                run_free_analysis(df)
+    
+    else:  # AI Mode
+        prompt_blocks = st.session_state['prompt_blocks']
+        
+        estimated_tokens = prompt_blocks['chars'] // 4
+        estimated_cost = (estimated_tokens * 3 / 1_000_000) + (2000 * 15 / 1_000_000)
+        
+        st.info(f"💰 Estimated cost: **${estimated_cost:.3f}** | {estimated_tokens:,} tokens")
+        
+        if st.button("🚀 Generate AI Insights", use_container_width=True):
+            if not api_key:
+                st.error("❌ Please add your Anthropic API key in the sidebar")
+            elif not ANTHROPIC_AVAILABLE:
+                st.error("❌ The anthropic package is not installed. Run: pip install anthropic")
+            else:
+                prompt = AI_PROMPT_TEMPLATE.format(
+                    positive_block=prompt_blocks['pos'],
+                    negative_block=prompt_blocks['neg'],
+                )
+
+                try:
+                    status_placeholder = st.empty()
+                    analysis_placeholder = st.empty()
+                    cache_key = ai_cache_key(api_key, prompt)
+                    analysis = get_cached_report(cache_key)
+                    
+                    if analysis is not None:
+                        # Same reviews already analyzed: reuse the report instead of paying again
+                        analysis_placeholder.markdown(analysis)
+                        status_placeholder.success("✅ Analysis loaded from cache (no API cost)")
+                    else:
+                        client = get_anthropic_client(api_key)
+                        
+                        # Stream so text appears as soon as the first tokens arrive; the status
+                        # line stands in for a spinner until the report is complete
+                        status_placeholder.info("🤖 Claude is analyzing your reviews... (30-60 seconds)")
+                        chunks = []
+                        
+                        with client.messages.stream(
+                            model="claude-sonnet-4-20250514",
+                            max_tokens=2500,
+                            messages=[{"role": "user", "content": prompt}]
+                        ) as stream:
+                            for text in stream.text_stream:
+                                chunks.append(text)
+                                analysis_placeholder.markdown(''.join(chunks))
+                            message = stream.get_final_message()
+                        
+                        analysis = ''.join(chunks)
+                        store_cached_report(cache_key, analysis)
+                        
+                        input_tokens = message.usage.input_tokens
+                        output_tokens = message.usage.output_tokens
+                        actual_cost = (input_tokens * 3 / 1_000_000) + (output_tokens * 15 / 1_000_000)
+                        
+                        st.session_state['total_cost'] += actual_cost
+                        
+                        status_placeholder.success(f"✅ Analysis complete! Cost: ${actual_cost:.3f}")
+                    
+                    st.download_button(
+                        "📥 Download Report",
+                        analysis,
+                        "ai_insights.md",
+                        "text/markdown",
+                        use_container_width=True
+                    )
+                    
+                except Exception as e:
+                    st.error(f"❌ API Error: {e}")
+
+
+@st.fragment
+def render_post_scrape(df, analysis_mode, api_key):
+    """
+    Render everything below the quick stats from a single DataFrame binding
+    """
+    render_insights(df, analysis_mode, api_key)
+    
+    st.markdown("---")
+    st.markdown("### 📝 Sample Reviews")
+    
+    render_samples(df, st.session_state['buckets'])
+
+
+# Page config
+st.set_page_config(
+    page_title="AppScope - App Store Analytics",
+    page_icon="🔍",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Professional CSS Theme
+st.markdown(build_theme_css(), unsafe_allow_html=True)
 
 # Header
-st.markdown('<h1 class="main-header">🔍 AppScope</h1>', unsafe_allow_html=True)
-st.markdown('<p class="subtitle">Deep insights from App Store reviews in minutes</p>', unsafe_allow_html=True)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # Sidebar
 with st.sidebar:
@@ -179,6 +622,7 @@ col1, col2 = st.columns([2, 1])
 with col1:
     app_url = st.text_input(
         "📱 App Store URL",
+        key="app_url",
         placeholder="https://apps.apple.com/us/app/example-app/id1234567890",
         label_visibility="collapsed"
     )
@@ -197,266 +641,44 @@ with st.expander("📌 Try These Examples"):
     cols = st.columns(3)
     for idx, (name, url) in enumerate(examples.items()):
         with cols[idx]:
-            if st.button(f"📱 {name}", use_container_width=True):
-                st.session_state['selected_url'] = url
-                st.rerun()
+            st.button(f"📱 {name}", use_container_width=True, on_click=select_example, args=(url,))
 
-if 'selected_url' in st.session_state:
-    app_url = st.session_state['selected_url']
-
-# Main scraping flow
-if analyze_btn or app_url:
+# Main scraping flow: only scrape on an explicit click or a new URL, not on every rerun
+should_scrape = analyze_btn or (app_url and app_url != st.session_state.get('scraped_url'))
+if should_scrape:
     app_id = extract_app_id(app_url)
     
     if not app_id:
         st.error("❌ Invalid App Store URL. Please check and try again.")
     else:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        def progress_callback(page, status):
-            progress_bar.progress(page * 10)
-            status_text.text(status)
-        
         with st.spinner("🔄 Scraping reviews..."):
             # Get overall app metadata first
             app_metadata = get_app_metadata(app_id)
-            df = scrape_app_reviews(app_id, max_pages=10, progress_callback=progress_callback)
+            df = load_reviews(app_id)
         
-        progress_bar.progress(100)
-        status_text.text("✅ Scraping complete!")
+        st.session_state['scraped_url'] = app_url
         
         if len(df) == 0:
+            st.session_state.pop('reviews_df', None)
             st.error("❌ No reviews found.")
         else:
             st.session_state['reviews_df'] = df
             st.session_state['app_metadata'] = app_metadata
-            st.session_state['analyses_run'] += 1
-            
-            st.success(f"✅ Successfully analyzed **{len(df)}** recent reviews!")
-            
-            # Quick Stats
-            st.markdown("### 📊 Quick Stats")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                # Show total reviews from App Store, not just scraped
-                total = app_metadata.get('total_reviews', 0)
-                if total:
-                    st.metric("Total Reviews", f"{total:,}")
-                    st.caption(f"Analyzed: {len(df):,}")
-                else:
-                    st.metric("Analyzed Reviews", f"{len(df):,}")
-            
-            with col2:
-                # Show overall App Store rating, not average of scraped
-                overall_rating = app_metadata.get('overall_rating')
-                if overall_rating:
-                    st.metric("App Store Rating", f"{overall_rating:.1f} ⭐")
-                    scraped_avg = df['rating'].mean()
-                    st.caption(f"Recent avg: {scraped_avg:.1f}⭐")
-                else:
-                    avg_rating = df['rating'].mean()
-                    st.metric("Average Rating", f"{avg_rating:.1f} ⭐")
-            
-            with col3:
-                positive_pct = (df['rating'] >= 4).sum() / len(df) * 100
-                st.metric("Positive", f"{positive_pct:.0f}%")
-            
-            with col4:
-                negative_pct = (df['rating'] <= 2).sum() / len(df) * 100
-                st.metric("Negative", f"{negative_pct:.0f}%")
-            
-            st.markdown("")  # Spacing
-            
-            # Rating distribution with Plotly
-            st.markdown('<p class="section-header">📈 Rating Distribution</p>', unsafe_allow_html=True)
-            
-            rating_counts = df['rating'].value_counts().sort_index()
-            colors = ['#DC2626', '#F97316', '#EAB308', '#84CC16', '#22C55E']
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=[f"{'⭐' * int(r)}" for r in rating_counts.index],
-                    y=rating_counts.values,
-                    marker_color=[colors[int(r)-1] for r in rating_counts.index],
-                    text=rating_counts.values,
-                    textposition='outside',
-                    hovertemplate='<b>%{x}</b><br>%{y} reviews<extra></extra>'
-                )
-            ])
-            
-            fig.update_layout(
-                title=None,
-                xaxis_title=None,
-                yaxis_title="Number of Reviews",
-                height=350,
-                margin=dict(t=20, b=40, l=60, r=20),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family="Inter, sans-serif", size=12),
-                xaxis=dict(tickfont=dict(size=14)),
-                yaxis=dict(gridcolor='#E5E7EB', gridwidth=1),
+            # Truncate once on ingest; the shortened columns only live on the buckets,
+            # so the CSV export keeps the scraped columns as-is
+            reviews = df.assign(
+                review_short=df['review'].str.slice(0, 300),
+                date_short=df['date'].str.slice(0, 10),
             )
-            
-            st.plotly_chart(fig, use_container_width=True)
-
-# Analysis Section
-if 'reviews_df' in st.session_state:
-    df = st.session_state['reviews_df']
-    
-    st.markdown("---")
-    st.markdown("### 🤖 Deep Insights")
-    
-    if analysis_mode == "🆓 Free (Basic)":
-        if st.button("🚀 Run Free Analysis", use_container_width=True):
-            with st.spinner("Analyzing reviews..."):
-                run_free_analysis(df)
-    
-    else:  # AI Mode
-        positive_sample = df[df['rating'] >= 4].head(30)
-        negative_sample = df[df['rating'] <= 2].head(30)
-        
-        total_chars = sum(len(str(r)) for r in positive_sample['review']) + \
-                      sum(len(str(r)) for r in negative_sample['review'])
-        
-        estimated_tokens = total_chars // 4
-        estimated_cost = (estimated_tokens * 3 / 1_000_000) + (2000 * 15 / 1_000_000)
-        
-        st.info(f"💰 Estimated cost: **${estimated_cost:.3f}** | {estimated_tokens:,} tokens")
-        
-        if st.button("🚀 Generate AI Insights", use_container_width=True):
-            if not api_key:
-                st.error("❌ Please add your Anthropic API key in the sidebar")
-            else:
-                with st.spinner("🤖 Claude is analyzing your reviews... (30-60 seconds)"):
-                    
-                    prompt = f"""Analyze these app reviews and provide structured insights for a product manager:
-
-POSITIVE REVIEWS (4-5 stars):
-{chr(10).join(f"- {r[:300]}" for r in positive_sample['review'].dropna())}
-
-NEGATIVE REVIEWS (1-2 stars):
-{chr(10).join(f"- {r[:300]}" for r in negative_sample['review'].dropna())}
-
-Provide a structured analysis:
-
-## 1. CRITICAL JOBS TO BE DONE (2-4 only)
-Identify HIGH-STAKES jobs users are hiring this app for. Requirements for each job:
-- Must have 5+ mentions OR be high-stakes (insurance claims, moving, estate planning, disaster recovery)
-- Show clear BEFORE/AFTER pain point being solved
-- Be specific enough to build features for
-
-DO NOT include:
-- Generic feature usage like "organize belongings" or "track items" (that's what the app does, not a job)
-- Vague goals like "stay organized" or "manage stuff"
-
-Format each as:
-- **Specific Job Title** | Mentions: X | Stakes: [High/Critical] | Quote: "..." | So What: [why this matters to users]
-
-Example GOOD job: "Maximize insurance payout after home disaster by proving ownership with photos and values"
-Example BAD job: "Organize and track home belongings" (too generic)
-
-## 2. TOP 5 FEATURES USERS LOVE
-Format:
-- **Feature** | Mentions: X | Why: [explanation] | Quote: "..." | Recommendation: [how to leverage this]
-
-## 3. TOP 5 CRITICAL COMPLAINTS
-Focus on complaints that cause churn or block adoption. Format:
-- **Issue** | Mentions: X | Impact: [Churn/Blocker/Friction] | Quote: "..." | Fix Priority: [P0/P1/P2]
-
-## 4. COMPETITIVE POSITIONING
-Based on what users say about alternatives or comparisons:
-- What makes this app unique vs. competitors mentioned?
-- What do users wish this app had from competitors?
-- Where is this app vulnerable?
-
-## 5. SURPRISING INSIGHTS
-2-3 non-obvious patterns that would change product strategy:
-- Unexpected use cases or user segments
-- Counter-intuitive behavior patterns
-- Hidden opportunities
-
-End each section with actionable "So What?" implications for the product team."""
-
-                    try:
-                        import anthropic
-                        
-                        client = anthropic.Anthropic(api_key=api_key)
-                        
-                        message = client.messages.create(
-                            model="claude-sonnet-4-20250514",
-                            max_tokens=2500,
-                            messages=[{"role": "user", "content": prompt}]
-                        )
-                        
-                        analysis = message.content[0].text
-                        
-                        input_tokens = message.usage.input_tokens
-                        output_tokens = message.usage.output_tokens
-                        actual_cost = (input_tokens * 3 / 1_000_000) + (output_tokens * 15 / 1_000_000)
-                        
-                        st.session_state['total_cost'] += actual_cost
-                        
-                        st.success(f"✅ Analysis complete! Cost: ${actual_cost:.3f}")
-                        st.markdown(analysis)
-                        
-                        st.download_button(
-                            "📥 Download Report",
-                            analysis,
-                            "ai_insights.md",
-                            "text/markdown",
-                            use_container_width=True
-                        )
-                        
-                    except Exception as e:
-                        st.error(f"❌ API Error: {e}")
+            st.session_state['buckets'] = split_by_rating(reviews)
+            st.session_state['prompt_blocks'] = build_prompt_blocks(st.session_state['buckets'])
+            st.session_state['analyses_run'] += 1
 
-# Sample Reviews
+# Quick Stats, then Analysis and Sample Reviews
 if 'reviews_df' in st.session_state:
     df = st.session_state['reviews_df']
     
-    st.markdown("---")
-    st.markdown("### 📝 Sample Reviews")
-    
-    tab1, tab2, tab3 = st.tabs(["😊 Positive (4-5 ⭐)", "😐 Neutral (3 ⭐)", "😞 Negative (1-2 ⭐)"])
-    
-    with tab1:
-        positive = df[df['rating'] >= 4].head(10)
-        if len(positive) == 0:
-            st.info("No positive reviews found")
-        else:
-            for idx, row in positive.iterrows():
-                with st.expander(f"⭐ {row['rating']} stars - {row['title']}", expanded=(idx==positive.index[0])):
-                    st.write(row['review'])
-                    st.caption(f"👤 **{row['author']}** • 📅 {row['date'][:10]} • 📱 Version {row['version']}")
-    
-    with tab2:
-        neutral = df[df['rating'] == 3].head(10)
-        if len(neutral) == 0:
-            st.info("No neutral reviews found")
-        else:
-            for idx, row in neutral.iterrows():
-                with st.expander(f"⭐ {row['rating']} stars - {row['title']}", expanded=(idx==neutral.index[0])):
-                    st.write(row['review'])
-                    st.caption(f"👤 **{row['author']}** • 📅 {row['date'][:10]} • 📱 Version {row['version']}")
+    st.success(f"✅ Successfully analyzed **{len(df)}** recent reviews!")
     
-    with tab3:
-        negative = df[df['rating'] <= 2].head(10)
-        if len(negative) == 0:
-            st.info("No negative reviews found")
-        else:
-            for idx, row in negative.iterrows():
-                with st.expander(f"⭐ {row['rating']} stars - {row['title']}", expanded=(idx==negative.index[0])):
-                    st.write(row['review'])
-                    st.caption(f"👤 **{row['author']}** • 📅 {row['date'][:10]} • 📱 Version {row['version']}")
-    
-    st.markdown("---")
-    st.download_button(
-        "📥 Download Full Dataset (CSV)",
-        df.to_csv(index=False),
-        "reviews.csv",
-        "text/csv",
-        use_container_width=True
-    )
+    render_stats(df, st.session_state['app_metadata'])
+    render_post_scrape(df, analysis_mode, api_key)
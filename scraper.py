@@ -2,10 +2,59 @@
 App Store review scraper
 """
 
-import feedparser
-import pandas as pd
 import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+MAX_WORKERS = 8
+
+REVIEW_COLUMNS = ('rating', 'title', 'review', 'author', 'version', 'date')
+
+# Scraped reviews are also kept on disk so they survive server restarts
+CACHE_DIR = Path('.cache')
+CACHE_TTL = 3600  # seconds
+
+# Namespaces of the customer reviews Atom feed
+ATOM = '{http://www.w3.org/2005/Atom}'
+ITUNES = '{http://itunes.apple.com/rss}'
+
+# One pooled session for every itunes.apple.com request, so connections are reused;
+# transient errors and rate limiting (429) are retried with backoff
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_app_metadata(app_id):
+    """
+    Look up app metadata, raising on request errors
+    
+    Exceptions are never cached, so a failed lookup is retried on the next call.
+    """
+    url = f"https://itunes.apple.com/lookup?id={app_id}"
+    response = SESSION.get(url, timeout=10)
+    data = response.json()
+    
+    if data.get('resultCount', 0) > 0:
+        app_data = data['results'][0]
+        return {
+            'overall_rating': app_data.get('averageUserRating', 0),
+            'total_reviews': app_data.get('userRatingCount', 0),
+            'app_name': app_data.get('trackName', 'Unknown App')
+        }
+    return None
 
 
 def get_app_metadata(app_id):
@@ -19,17 +68,9 @@ def get_app_metadata(app_id):
         dict with 'overall_rating', 'total_reviews', 'app_name'
     """
     try:
-        url = f"https://itunes.apple.com/lookup?id={app_id}"
-        response = requests.get(url, timeout=10)
-        data = response.json()
-        
-        if data.get('resultCount', 0) > 0:
-            app_data = data['results'][0]
-            return {
-                'overall_rating': app_data.get('averageUserRating', 0),
-                'total_reviews': app_data.get('userRatingCount', 0),
-                'app_name': app_data.get('trackName', 'Unknown App')
-            }
+        metadata = fetch_app_metadata(app_id)
+        if metadata:
+            return metadata
     except Exception as e:
         print(f"Error fetching app metadata: {e}")
     
@@ -40,6 +81,52 @@ def get_app_metadata(app_id):
     }
 
 
+@st.cache_data(ttl=1800, show_spinner=False)
+def fetch_review_page(app_id, page):
+    """
+    Fetch and parse one page of the customer reviews feed
+    
+    Args:
+        app_id: Apple App Store app ID
+        page: Feed page number (1-based)
+    
+    Returns:
+        dict of column name -> list of values; the lists are empty once the feed runs out
+    """
+    url = f"https://itunes.apple.com/us/rss/customerreviews/page={page}/id={app_id}/sortBy=mostRecent/xml"
+    response = SESSION.get(url, timeout=10)
+    # The feed schema is fixed, so read the six fields straight from the XML tree;
+    # the first <content> of an entry is the plain-text review
+    entries = ET.fromstring(response.content).findall(f'{ATOM}entry')
+    return {
+        'rating': [int(entry.findtext(f'{ITUNES}rating') or 0) for entry in entries],
+        'title': [entry.findtext(f'{ATOM}title', '') for entry in entries],
+        'review': [entry.findtext(f'{ATOM}content', '') for entry in entries],
+        'author': [entry.findtext(f'{ATOM}author/{ATOM}name', '') for entry in entries],
+        'version': [entry.findtext(f'{ITUNES}version', '') for entry in entries],
+        'date': [entry.findtext(f'{ATOM}updated', '') for entry in entries],
+    }
+
+
+def load_cached_reviews(path):
+    """Return reviews saved at path if they are younger than CACHE_TTL, else None"""
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL:
+            return pd.read_parquet(path)
+    except Exception:
+        pass  # Missing, unreadable or stale: scrape again
+    return None
+
+
+def save_cached_reviews(path, df):
+    """Persist scraped reviews as snappy-compressed parquet; caching is best effort"""
+    try:
+        path.parent.mkdir(exist_ok=True)
+        df.to_parquet(path, compression='snappy', index=False)
+    except Exception as e:
+        print(f"Error caching reviews: {e}")
+
+
 def scrape_app_reviews(app_id, max_pages=10, progress_callback=None):
     """
     Scrape reviews from Apple App Store RSS feed
@@ -52,36 +139,48 @@ def scrape_app_reviews(app_id, max_pages=10, progress_callback=None):
     Returns:
         pandas DataFrame with columns: rating, title, review, author, version, date
     """
-    all_reviews = []
+    cache_path = CACHE_DIR / f"{app_id}-{max_pages}.parquet"
+    cached = load_cached_reviews(cache_path)
+    if cached is not None:
+        return cached
     
-    for page in range(1, max_pages + 1):
-        if progress_callback:
-            progress_callback(page, f"Fetching page {page}/{max_pages}...")
-        
-        url = f"https://itunes.apple.com/us/rss/customerreviews/page={page}/id={app_id}/sortBy=mostRecent/xml"
+    columns = {name: [] for name in REVIEW_COLUMNS}
+    pages = range(1, max_pages + 1)
+    complete = True
+    
+    # Pages are independent, so request them all at once; results are consumed in
+    # feed order on this thread, which is also where progress_callback runs
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(fetch_review_page, app_id, page) for page in pages]
         
-        try:
-            feed = feedparser.parse(url)
+        for page, future in zip(pages, futures):
+            if progress_callback:
+                progress_callback(page, f"Fetching page {page}/{max_pages}...")
             
-            # If no entries, we've reached the end
-            if not feed.entries:
+            try:
+                page_columns = future.result()
+            except Exception as e:
+                if progress_callback:
+                    progress_callback(page, f"Error at page {page}: {e}")
+                complete = False
                 break
             
-            for entry in feed.entries:
-                all_reviews.append({
-                    'rating': int(entry.get('im_rating', 0)),
-                    'title': entry.get('title', ''),
-                    'review': entry.content[0].value if hasattr(entry, 'content') else '',
-                    'author': entry.get('author', ''),
-                    'version': entry.get('im_version', ''),
-                    'date': entry.get('updated', '')
-                })
-            
-            time.sleep(0.5)  # Be polite to Apple's servers
+            # If no entries, we've reached the end
+            if not page_columns['rating']:
+                break
             
-        except Exception as e:
-            if progress_callback:
-                progress_callback(page, f"Error at page {page}: {e}")
-            break
+            for name in REVIEW_COLUMNS:
+                columns[name].extend(page_columns[name])
+        
+        for future in futures:
+            future.cancel()
+    
+    # Build from typed column arrays so pandas skips per-row dict handling and inference
+    columns['rating'] = np.asarray(columns['rating'], dtype='int8')
+    df = pd.DataFrame(columns)
+    
+    # Only a scrape that ran to the end of the feed is worth reusing
+    if complete and len(df):
+        save_cached_reviews(cache_path, df)
     
-    return pd.DataFrame(all_reviews)
+    return df
@@ -3,7 +3,11 @@ Utility functions and constants for AppScope
 """
 
 import re
+from bisect import bisect_right
 from collections import Counter
+from functools import lru_cache
+
+import ahocorasick
 
 # Comprehensive stop words
 STOP_WORDS = {
@@ -61,6 +65,34 @@ FEATURE_PATTERNS = {
     ]
 }
 
+# Sentence boundary: whitespace following terminal punctuation
+SENTENCE_SPLIT_REGEX = re.compile(r'(?<=[.!?])\s+')
+
+# Runs of terminal punctuation, used by extract_sentences
+SENTENCE_END_REGEX = re.compile(r'[.!?]+')
+
+APP_ID_REGEX = re.compile(r'/id(\d+)')
+
+# JTBD signals, tried in order; the first pattern that matches wins
+SITUATION_REGEXES = [
+    re.compile(r'when (i|we) (need|want|have to|am|was) ([^,\.]{10,80})'),
+    re.compile(r'(after|during|while|before) ([^,\.]{10,80})'),
+    re.compile(r'for (my|our) ([^,\.]{10,50})'),
+]
+
+OUTCOME_REGEXES = [
+    re.compile(r'so (i|we) can ([^,\.]{10,80})'),
+    re.compile(r'(helps|helped|allows|lets) (me|us) (to )?([^,\.]{10,80})'),
+    re.compile(r'in order to ([^,\.]{10,80})'),
+    re.compile(r'because (i|we) (need|want) ([^,\.]{10,80})'),
+]
+
+# One case-insensitive alternation per feature category for vectorized matching
+FEATURE_REGEXES = {
+    category: re.compile('|'.join(re.escape(k) for k in keywords), re.IGNORECASE)
+    for category, keywords in FEATURE_PATTERNS.items()
+}
+
 # Forces of Progress patterns (Switch framework)
 FORCE_PATTERNS = {
     'push': {
@@ -124,24 +156,93 @@ OUTCOME_DIMENSIONS = {
 }
 
 
+@lru_cache(maxsize=128)
 def extract_app_id(url):
     """Extract app ID from App Store URL"""
-    match = re.search(r'/id(\d+)', url)
+    match = APP_ID_REGEX.search(url)
     return match.group(1) if match else None
 
 
+def build_theme_automaton(themes):
+    """
+    Build an Aho-Corasick automaton over a list of (theme_name, keywords)
+    
+    Each keyword maps to the indices of all themes that use it, so a single
+    automaton.iter() pass over a lowercase text yields every matching theme.
+    """
+    keyword_themes = {}
+    for idx, (_, keywords) in enumerate(themes):
+        for keyword in keywords:
+            keyword_themes.setdefault(keyword, []).append(idx)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, theme_indices in keyword_themes.items():
+        automaton.add_word(keyword, tuple(theme_indices))
+    automaton.make_automaton()
+    return automaton
+
+
 def extract_sentences(text):
     """Split text into sentences"""
-    return re.split(r'[.!?]+', str(text))
+    return SENTENCE_END_REGEX.split(str(text))
+
+
+def split_sentences(text):
+    """
+    Split text into sentences on terminal punctuation
+    
+    Returns (sentences, starts) where starts[i] is the offset of sentences[i]
+    in text, so a match position can be mapped to its sentence with bisect.
+    """
+    sentences = []
+    starts = [0]
+    for boundary in SENTENCE_SPLIT_REGEX.finditer(text):
+        sentences.append(text[starts[-1]:boundary.start()])
+        starts.append(boundary.end())
+    sentences.append(text[starts[-1]:])
+    return sentences, starts
+
+
+@lru_cache(maxsize=None)
+def keyword_list_automaton(keywords):
+    """Aho-Corasick automaton mapping each keyword to its position in the tuple"""
+    automaton = ahocorasick.Automaton()
+    for priority, keyword in enumerate(keywords):
+        if keyword not in automaton:
+            automaton.add_word(keyword, priority)
+    automaton.make_automaton()
+    return automaton
 
 
 def find_keyword_in_text(text, keywords):
     """Check if any keyword exists in text, return first match"""
-    text_lower = str(text).lower()
-    for keyword in keywords:
-        if keyword in text_lower:
-            return keyword
-    return None
+    keywords = tuple(keywords)
+    if not keywords:
+        return None
+    
+    # One pass for all keywords; the earliest keyword in the list wins
+    automaton = keyword_list_automaton(keywords)
+    priorities = [priority for _, priority in automaton.iter(str(text).lower())]
+    return keywords[min(priorities)] if priorities else None
+
+
+def first_unique(texts, limit, prefix_length=60):
+    """
+    Return the first `limit` texts with distinct starts, keeping their order
+    Only a short lowercase prefix is hashed, and scanning stops at the limit
+    """
+    unique = []
+    seen_starts = set()
+    
+    for text in texts:
+        start = text[:prefix_length].lower()
+        if start not in seen_starts:
+            unique.append(text)
+            seen_starts.add(start)
+            if len(unique) == limit:
+                break
+    
+    return unique
 
 
 def extract_snippet(text, keyword, before=30, after=100):
@@ -149,79 +250,76 @@ def extract_snippet(text, keyword, before=30, after=100):
     text_str = str(text)
     text_lower = text_str.lower()
     
-    if keyword not in text_lower:
+    # One scan: find() both tests for the keyword and locates it
+    idx = text_lower.find(keyword)
+    if idx == -1:
         return None
     
-    idx = text_lower.find(keyword)
     start = max(0, idx - before)
     end = min(len(text_str), idx + after)
     
     return text_str[start:end].strip()
 
 
-def extract_complete_sentence(text, keyword, max_length=400):
-    """Extract complete sentence(s) containing a keyword"""
+def extract_complete_sentence(text, keyword, max_length=400, text_lower=None, sentences=None):
+    """
+    Extract complete sentence(s) containing a keyword
+    Pass text_lower and sentences (the split_sentences() table) when the
+    caller already has them, to avoid re-lowering and re-splitting text
+    """
     text_str = str(text)
-    text_lower = text_str.lower()
+    if text_lower is None:
+        text_lower = text_str.lower()
     
-    if keyword not in text_lower:
+    position = text_lower.find(keyword)
+    if position == -1:
         return None
     
     # Split into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', text_str)
-    
-    # Find sentence containing keyword
-    for i, sentence in enumerate(sentences):
-        if keyword in sentence.lower():
-            result = sentence.strip()
-            
-            # If sentence is too short, add adjacent sentences
-            if len(result) < 50 and i + 1 < len(sentences):
-                result += " " + sentences[i + 1].strip()
-            if len(result) < 50 and i > 0:
-                result = sentences[i - 1].strip() + " " + result
-            
-            # Cap at max length
-            if len(result) > max_length:
-                result = result[:max_length] + "..."
-            
-            return result
-    
-    return None
+    if sentences is None:
+        sentences = split_sentences(text_str)
+    sentence_list, starts = sentences
+    
+    # Find sentence containing keyword from the offset of its first occurrence
+    i = bisect_right(starts, position) - 1
+    if keyword not in sentence_list[i].lower():
+        # Lowercasing changed some offsets (rare Unicode case), scan instead
+        i = next((j for j, sentence in enumerate(sentence_list) if keyword in sentence.lower()), None)
+        if i is None:
+            return None
+    
+    result = sentence_list[i].strip()
+    
+    # If sentence is too short, add adjacent sentences
+    if len(result) < 50 and i + 1 < len(sentence_list):
+        result += " " + sentence_list[i + 1].strip()
+    if len(result) < 50 and i > 0:
+        result = sentence_list[i - 1].strip() + " " + result
+    
+    # Cap at max length
+    if len(result) > max_length:
+        result = result[:max_length] + "..."
+    
+    return result
 
 
 def extract_jtbd_components(text):
     """Extract situation, action, and outcome from review text"""
     text_lower = str(text).lower()
     
-    # Situation signals
-    situation_patterns = [
-        r'when (i|we) (need|want|have to|am|was) ([^,\.]{10,80})',
-        r'(after|during|while|before) ([^,\.]{10,80})',
-        r'for (my|our) ([^,\.]{10,50})',
-    ]
-    
-    # Outcome signals
-    outcome_patterns = [
-        r'so (i|we) can ([^,\.]{10,80})',
-        r'(helps|helped|allows|lets) (me|us) (to )?([^,\.]{10,80})',
-        r'in order to ([^,\.]{10,80})',
-        r'because (i|we) (need|want) ([^,\.]{10,80})',
-    ]
-    
     situation = None
     outcome = None
     
     # Extract situation
-    for pattern in situation_patterns:
-        match = re.search(pattern, text_lower)
+    for regex in SITUATION_REGEXES:
+        match = regex.search(text_lower)
         if match:
             situation = match.group(0)
             break
     
     # Extract outcome
-    for pattern in outcome_patterns:
-        match = re.search(pattern, text_lower)
+    for regex in OUTCOME_REGEXES:
+        match = regex.search(text_lower)
         if match:
             outcome = match.group(0)
             break